@@ -1,9 +1,12 @@
 """Authentication utilities."""
 
-from datetime import datetime, timedelta
+import hashlib
+import time
+from datetime import datetime, timedelta, timezone
 from typing import Optional
 
 import bcrypt
+from cachetools import TTLCache
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
@@ -12,6 +15,8 @@ from .config import (
     SECRET_KEY, 
     ALGORITHM, 
     ACCESS_TOKEN_EXPIRE_MINUTES,
+    TOKEN_CACHE_TTL_SECONDS,
+    TOKEN_CACHE_MAX_SIZE,
     DEFAULT_ADMIN_USERNAME,
     DEFAULT_ADMIN_PASSWORD
 )
@@ -21,6 +26,9 @@ from .storage import user_storage
 # OAuth2 scheme
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/auth/token")
 
+# Recently verified tokens: sha256(token) -> (user, token expiry timestamp)
+_token_cache = TTLCache(maxsize=TOKEN_CACHE_MAX_SIZE, ttl=TOKEN_CACHE_TTL_SECONDS)
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against its hash."""
@@ -41,7 +49,7 @@ def get_password_hash(password: str) -> str:
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create a JWT access token."""
     to_encode = data.copy()
-    expire = datetime.utcnow() + (expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
+    expire = datetime.now(timezone.utc) + (expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
     to_encode.update({"exp": expire})
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
@@ -58,6 +66,13 @@ def authenticate_user(username: str, password: str) -> Optional[User]:
 
 async def get_current_user(token: str = Depends(oauth2_scheme)) -> User:
     """Get the current authenticated user from JWT token."""
+    cache_key = hashlib.sha256(token.encode('utf-8')).digest()
+    cached = _token_cache.get(cache_key)
+    if cached is not None:
+        user, expires_at = cached
+        if time.time() < expires_at:
+            return user
+    
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -75,9 +90,18 @@ async def get_current_user(token: str = Depends(oauth2_scheme)) -> User:
     user = user_storage.get_by_username(token_data.username)
     if user is None:
         raise credentials_exception
+    _token_cache[cache_key] = (user, payload.get("exp", float("inf")))
     return user
 
 
+def invalidate_user_tokens(username: str):
+    """Drop cached token verifications for a user."""
+    for key in list(_token_cache.keys()):
+        entry = _token_cache.get(key)
+        if entry is not None and entry[0].username == username:
+            _token_cache.pop(key, None)
+
+
 async def get_current_active_user(current_user: User = Depends(get_current_user)) -> User:
     """Get the current active (non-disabled) user."""
     if current_user.disabled:
@@ -85,8 +109,22 @@ async def get_current_active_user(current_user: User = Depends(get_current_user)
     return current_user
 
 
+async def require_admin(current_user: User = Depends(get_current_active_user)) -> User:
+    """Get the current user, requiring admin rights."""
+    if not current_user.effective_admin:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin access required"
+        )
+    return current_user
+
+
 def ensure_default_admin():
-    """Ensure the default admin user exists."""
+    """Ensure the default admin user exists.
+    
+    The password is only hashed on first boot; once the admin is stored,
+    restarts skip bcrypt entirely.
+    """
     if not user_storage.exists(DEFAULT_ADMIN_USERNAME):
         admin = User(
             username=DEFAULT_ADMIN_USERNAME,
@@ -11,11 +11,14 @@ DATA_DIR = Path(os.getenv("KANBAN_DATA_DIR", BASE_DIR / "data"))
 TASKS_FILE = DATA_DIR / "tasks.json"
 USERS_FILE = DATA_DIR / "users.json"
 CATEGORIES_FILE = DATA_DIR / "categories.json"
+FLUSH_INTERVAL_SECONDS = 0.2  # How often pending changes are written to disk
 
 # Security
 SECRET_KEY = os.getenv("KANBAN_SECRET_KEY", "change-this-in-production-use-a-real-secret-key")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24  # 24 hours
+TOKEN_CACHE_TTL_SECONDS = 10  # How long a verified token skips re-verification
+TOKEN_CACHE_MAX_SIZE = 10000
 
 # Default admin credentials (change in production!)
 DEFAULT_ADMIN_USERNAME = os.getenv("KANBAN_ADMIN_USERNAME", "admin")
@@ -23,6 +26,7 @@ DEFAULT_ADMIN_PASSWORD = os.getenv("KANBAN_ADMIN_PASSWORD", "changeme")
 
 # Kanban columns
 COLUMNS = ["Recurring", "Backlog", "In Progress", "Review", "Done"]
+COLUMNS_SET = frozenset(COLUMNS)
 
 # Priority levels
 PRIORITIES = ["High", "Medium", "Low"]
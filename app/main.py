@@ -1,5 +1,8 @@
 """Main FastAPI application."""
 
+import asyncio
+import logging
+
 from fastapi import FastAPI, Request
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse
@@ -7,6 +10,10 @@ from pathlib import Path
 
 from .routes import auth, tasks
 from .auth import ensure_default_admin
+from .config import FLUSH_INTERVAL_SECONDS
+from .storage import flush_all
+
+logger = logging.getLogger(__name__)
 
 # Create app
 app = FastAPI(
@@ -25,10 +32,32 @@ if static_path.exists():
     app.mount("/static", StaticFiles(directory=str(static_path)), name="static")
 
 
+async def _periodic_flush():
+    """Write pending storage changes to disk in the background."""
+    while True:
+        await asyncio.sleep(FLUSH_INTERVAL_SECONDS)
+        try:
+            # Disk I/O runs off the event loop; storages snapshot under their own lock
+            await asyncio.to_thread(flush_all)
+        except Exception:
+            # Log and keep going; one bad tick must not stop later flushes
+            logger.exception("Failed to flush storage to disk")
+
+
 @app.on_event("startup")
 async def startup():
     """Run on application startup."""
     ensure_default_admin()
+    app.state.flush_task = asyncio.create_task(_periodic_flush())
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    """Run on application shutdown."""
+    flush_task = getattr(app.state, "flush_task", None)
+    if flush_task is not None:
+        flush_task.cancel()
+    flush_all()
 
 
 @app.get("/")
@@ -1,16 +1,23 @@
 """Pydantic models for the Kanban board."""
 
-from datetime import datetime
-from typing import Optional
-from pydantic import BaseModel, Field
+from datetime import datetime, timezone
+from typing import Literal, Optional
+from pydantic import BaseModel, ConfigDict, Field
 from uuid import uuid4
 
+Priority = Literal["High", "Medium", "Low"]
+
+
+def utcnow() -> datetime:
+    """Get the current UTC time as a naive datetime, the format tasks are stored in."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
 
 class TaskBase(BaseModel):
     """Base task model with common fields."""
     title: str = Field(..., min_length=1, max_length=200)
     description: Optional[str] = Field(None, max_length=2000)
-    priority: str = Field("Medium", pattern="^(High|Medium|Low)$")
+    priority: Priority = "Medium"
     category: Optional[str] = Field(None, max_length=50)
     due_date: Optional[datetime] = None
 
@@ -24,7 +31,7 @@ class TaskUpdate(BaseModel):
     """Model for updating a task (all fields optional)."""
     title: Optional[str] = Field(None, min_length=1, max_length=200)
     description: Optional[str] = Field(None, max_length=2000)
-    priority: Optional[str] = Field(None, pattern="^(High|Medium|Low)$")
+    priority: Optional[Priority] = None
     category: Optional[str] = Field(None, max_length=50)
     due_date: Optional[datetime] = None
     column: Optional[str] = None
@@ -34,13 +41,10 @@ class Task(TaskBase):
     """Complete task model with all fields."""
     id: str = Field(default_factory=lambda: str(uuid4()))
     column: str = Field("Backlog")
-    created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=utcnow)
+    updated_at: datetime = Field(default_factory=utcnow)
 
-    class Config:
-        json_encoders = {
-            datetime: lambda v: v.isoformat()
-        }
+    model_config = ConfigDict(revalidate_instances='never')
 
 
 class TaskMove(BaseModel):
@@ -56,6 +60,13 @@ class User(BaseModel):
     disabled: bool = False
     is_admin: bool = False
 
+    model_config = ConfigDict(revalidate_instances='never')
+
+    @property
+    def effective_admin(self) -> bool:
+        """Whether the user has admin rights (the "admin" account always does)."""
+        return self.is_admin or self.username == "admin"
+
 
 class UserCreate(BaseModel):
     """Model for creating a new user."""
@@ -68,6 +79,8 @@ class Token(BaseModel):
     access_token: str
     token_type: str = "bearer"
 
+    model_config = ConfigDict(revalidate_instances='never')
+
 
 class TokenData(BaseModel):
     """Data extracted from JWT token."""
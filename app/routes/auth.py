@@ -7,7 +7,10 @@ from ..auth import (
     authenticate_user,
     create_access_token,
     get_password_hash,
-    get_current_active_user
+    get_current_active_user,
+    invalidate_user_tokens,
+    require_admin,
+    verify_password
 )
 from ..models import Token, User, UserCreate, PasswordChange
 from ..storage import user_storage
@@ -52,32 +55,20 @@ async def get_me(current_user: User = Depends(get_current_active_user)):
     """Get current user info."""
     return {
         "username": current_user.username,
-        "is_admin": current_user.is_admin or current_user.username == "admin"
+        "is_admin": current_user.effective_admin
     }
 
 
 @router.get("/users")
-async def list_users(current_user: User = Depends(get_current_active_user)):
+async def list_users(current_user: User = Depends(require_admin)):
     """List all users (admin only)."""
-    if not (current_user.is_admin or current_user.username == "admin"):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Admin access required"
-        )
-    
     users = user_storage.list_all()
-    return {"users": [{"username": u.username, "is_admin": u.is_admin or u.username == "admin"} for u in users]}
+    return {"users": [{"username": u.username, "is_admin": u.effective_admin} for u in users]}
 
 
 @router.delete("/users/{username}")
-async def delete_user(username: str, current_user: User = Depends(get_current_active_user)):
+async def delete_user(username: str, current_user: User = Depends(require_admin)):
     """Delete a user (admin only)."""
-    if not (current_user.is_admin or current_user.username == "admin"):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Admin access required"
-        )
-    
     if username == "admin":
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -97,6 +88,7 @@ async def delete_user(username: str, current_user: User = Depends(get_current_ac
         )
     
     user_storage.delete(username)
+    invalidate_user_tokens(username)
     return {"message": f"User {username} deleted"}
 
 
@@ -106,8 +98,6 @@ async def change_password(
     current_user: User = Depends(get_current_active_user)
 ):
     """Change the current user's password."""
-    from ..auth import verify_password
-    
     if not verify_password(password_data.current_password, current_user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -116,4 +106,5 @@ async def change_password(
     
     current_user.hashed_password = get_password_hash(password_data.new_password)
     user_storage.update(current_user)
+    invalidate_user_tokens(current_user.username)
     return {"message": "Password changed successfully"}
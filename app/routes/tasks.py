@@ -1,16 +1,58 @@
 """Task management routes."""
 
-from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+import hashlib
+from typing import Callable, Dict, List, Optional, Tuple
+
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status, Query
+from pydantic import TypeAdapter
 
 from ..auth import get_current_active_user
 from ..models import Task, TaskCreate, TaskUpdate, TaskMove, User
 from ..storage import task_storage
-from ..config import COLUMNS, PRIORITIES
+from ..config import COLUMNS, COLUMNS_SET, PRIORITIES
 
 router = APIRouter(prefix="/api/tasks", tags=["tasks"])
 
+# Built once; serialize task collections straight to JSON bytes
+_TASKS_ADAPTER = TypeAdapter(List[Task])
+_BOARD_ADAPTER = TypeAdapter(Dict[str, List[Task]])
+
+
+def _etag(body: bytes) -> str:
+    """Compute a strong ETag for a response body."""
+    return f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+
+def _json_response(request: Request, body: bytes, etag: str) -> Response:
+    """Return a pre-serialized JSON body, or 304 if the client already has it."""
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    return Response(content=body, media_type="application/json", headers={"ETag": etag})
+
+
+# Serialized bodies for rarely-changing endpoints: name -> (version, body, etag)
+_response_cache: Dict[str, Tuple[tuple, bytes, str]] = {}
+
 
+def _cached_body(name: str, version: tuple, build: Callable[[], bytes]) -> Tuple[bytes, str]:
+    """Get the serialized body for an endpoint, rebuilding it when the version changes."""
+    cached = _response_cache.get(name)
+    if cached is None or cached[0] != version:
+        body = build()
+        cached = (version, body, _etag(body))
+        _response_cache[name] = cached
+    return cached[1], cached[2]
+
+
+_COLUMNS_BODY = orjson.dumps({"columns": COLUMNS})
+_COLUMNS_ETAG = _etag(_COLUMNS_BODY)
+_PRIORITIES_BODY = orjson.dumps({"priorities": PRIORITIES})
+_PRIORITIES_ETAG = _etag(_PRIORITIES_BODY)
+
+
+# Endpoints returning task collections keep response_model for the OpenAPI
+# schema but return pre-serialized Responses, which FastAPI does not revalidate.
 @router.get("", response_model=List[Task])
 async def get_tasks(
     column: Optional[str] = Query(None, description="Filter by column"),
@@ -19,45 +61,41 @@ async def get_tasks(
     current_user: User = Depends(get_current_active_user)
 ):
     """Get all tasks, optionally filtered."""
-    tasks = task_storage.get_all()
-    
-    if column:
-        tasks = [t for t in tasks if t.column == column]
-    if priority:
-        tasks = [t for t in tasks if t.priority == priority]
-    if category:
-        tasks = [t for t in tasks if t.category == category]
-    
-    return tasks
+    tasks = task_storage.filter(column=column, priority=priority, category=category)
+    return Response(content=_TASKS_ADAPTER.dump_json(tasks), media_type="application/json")
 
 
 @router.get("/columns")
-async def get_columns(current_user: User = Depends(get_current_active_user)):
+async def get_columns(request: Request, current_user: User = Depends(get_current_active_user)):
     """Get available columns."""
-    return {"columns": COLUMNS}
+    return _json_response(request, _COLUMNS_BODY, _COLUMNS_ETAG)
 
 
 @router.get("/priorities")
-async def get_priorities(current_user: User = Depends(get_current_active_user)):
+async def get_priorities(request: Request, current_user: User = Depends(get_current_active_user)):
     """Get available priorities."""
-    return {"priorities": PRIORITIES}
+    return _json_response(request, _PRIORITIES_BODY, _PRIORITIES_ETAG)
 
 
 @router.get("/categories")
-async def get_categories(current_user: User = Depends(get_current_active_user)):
+async def get_categories(request: Request, current_user: User = Depends(get_current_active_user)):
     """Get all categories (from storage + existing tasks)."""
     from ..storage import category_storage
     
-    # Get stored categories
-    stored_cats = set(category_storage.get_all())
+    def build():
+        # Get stored categories
+        stored_cats = set(category_storage.get_all())
+        
+        # Get categories from existing tasks
+        tasks = task_storage.get_all()
+        task_cats = set(t.category for t in tasks if t.category)
+        
+        # Combine and sort
+        return orjson.dumps({"categories": sorted(stored_cats | task_cats)})
     
-    # Get categories from existing tasks
-    tasks = task_storage.get_all()
-    task_cats = set(t.category for t in tasks if t.category)
-    
-    # Combine and sort
-    all_categories = sorted(stored_cats | task_cats)
-    return {"categories": all_categories}
+    version = (task_storage.version, category_storage.version)
+    body, etag = _cached_body("categories", version, build)
+    return _json_response(request, body, etag)
 
 
 @router.post("/categories")
@@ -93,17 +131,14 @@ async def delete_category(
         raise HTTPException(status_code=404, detail="Category not found")
 
 
-@router.get("/board")
-async def get_board(current_user: User = Depends(get_current_active_user)):
+@router.get("/board", response_model=Dict[str, List[Task]])
+async def get_board(request: Request, current_user: User = Depends(get_current_active_user)):
     """Get all tasks organized by column."""
-    tasks = task_storage.get_all()
-    board = {col: [] for col in COLUMNS}
-    
-    for task in tasks:
-        if task.column in board:
-            board[task.column].append(task)
+    def build():
+        return _BOARD_ADAPTER.dump_json({col: task_storage.get_by_column(col) for col in COLUMNS})
     
-    return board
+    body, etag = _cached_body("board", (task_storage.version,), build)
+    return _json_response(request, body, etag)
 
 
 @router.get("/{task_id}", response_model=Task)
@@ -124,7 +159,7 @@ async def create_task(
     current_user: User = Depends(get_current_active_user)
 ):
     """Create a new task."""
-    if task_data.column not in COLUMNS:
+    if task_data.column not in COLUMNS_SET:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Invalid column. Must be one of: {COLUMNS}"
@@ -148,7 +183,7 @@ async def update_task(
             detail="Task not found"
         )
     
-    if task_data.column and task_data.column not in COLUMNS:
+    if task_data.column and task_data.column not in COLUMNS_SET:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Invalid column. Must be one of: {COLUMNS}"
@@ -173,7 +208,7 @@ async def move_task(
             detail="Task not found"
         )
     
-    if move_data.column not in COLUMNS:
+    if move_data.column not in COLUMNS_SET:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Invalid column. Must be one of: {COLUMNS}"
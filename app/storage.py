@@ -1,198 +1,412 @@
 """JSON file storage for tasks and users."""
 
-import json
+import mmap
+import os
+from abc import ABC, abstractmethod
+from collections import defaultdict
 from pathlib import Path
-from typing import Dict, List, Optional
-from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Set
 import threading
 
-from .models import Task, User
-from .config import TASKS_FILE, USERS_FILE, CATEGORIES_FILE, DATA_DIR
+import orjson
+from pydantic import TypeAdapter
 
+from .models import Task, User, utcnow
+from .config import TASKS_FILE, USERS_FILE, CATEGORIES_FILE
 
-class JSONStorage:
-    """Thread-safe JSON file storage."""
+# Files at least this large are read through mmap instead of a buffered copy
+MMAP_THRESHOLD_BYTES = 64 * 1024
+
+# Built once; validates a whole tasks.json payload in a single call
+_TASK_LIST_ADAPTER = TypeAdapter(List[Task])
+
+
+class JSONStorage(ABC):
+    """Thread-safe JSON file storage.
+    
+    ``_lock`` guards in-memory state and is only held for the mutation itself;
+    readers never take it. ``_write_lock`` lets a single writer at a time
+    serialize a snapshot and write it to disk, outside ``_lock``.
     
-    def __init__(self, file_path: Path):
+    ``version`` increases on every change so callers can cache data derived
+    from the storage and tell when it is stale.
+    
+    With ``persist=False`` the storage never touches the file: it starts
+    empty and writes are dropped, which is enough for unit tests.
+    """
+    
+    def __init__(self, file_path: Path, persist: bool = True):
         self.file_path = file_path
+        self.persist = persist
+        self.version = 0
         self._lock = threading.Lock()
+        self._write_lock = threading.RLock()
+        self._dirty = False
         self._ensure_file()
+        self._load()
     
     def _ensure_file(self):
         """Ensure the storage file and directory exist."""
-        DATA_DIR.mkdir(parents=True, exist_ok=True)
+        if not self.persist:
+            return
+        self.file_path.parent.mkdir(parents=True, exist_ok=True)
         if not self.file_path.exists():
             self._write_data([])
     
+    @abstractmethod
+    def _load(self):
+        """Load the file into the in-memory cache."""
+    
     def _read_data(self) -> List[Dict]:
         """Read data from JSON file."""
-        with self._lock:
-            try:
-                with open(self.file_path, 'r') as f:
-                    return json.load(f)
-            except (json.JSONDecodeError, FileNotFoundError):
-                return []
+        if not self.persist:
+            return []
+        try:
+            with open(self.file_path, 'rb') as f:
+                if os.fstat(f.fileno()).st_size < MMAP_THRESHOLD_BYTES:
+                    return orjson.loads(f.read())
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    with memoryview(mm) as view:
+                        return orjson.loads(view)
+        except (orjson.JSONDecodeError, FileNotFoundError):
+            return []
     
     def _write_data(self, data: List[Dict]):
-        """Write data to JSON file."""
-        with self._lock:
-            with open(self.file_path, 'w') as f:
-                json.dump(data, f, indent=2, default=str)
+        """Atomically write data to JSON file."""
+        if not self.persist:
+            return
+        with self._write_lock:
+            self.file_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.file_path.with_name(self.file_path.name + '.tmp')
+            with open(tmp_path, 'wb') as f:
+                f.write(orjson.dumps(data, default=str, option=orjson.OPT_INDENT_2))
+            os.replace(tmp_path, self.file_path)
+    
+    @abstractmethod
+    def _snapshot(self) -> List[Dict]:
+        """Return a copy of the in-memory data to persist.
+        
+        Called with ``_lock`` held; the copy must not share mutable state with
+        the cache, since it is serialized after the lock is released.
+        """
+    
+    def _mark_dirty(self):
+        """Flag in-memory changes for the next flush (call with ``_lock`` held)."""
+        self._dirty = True
+        self.version += 1
+    
+    def flush(self):
+        """Write pending in-memory changes to disk, if any."""
+        # Holding the write lock across snapshot and write keeps an older
+        # snapshot from landing on disk after a newer one
+        with self._write_lock:
+            with self._lock:
+                if not self._dirty:
+                    return
+                data = self._snapshot()
+                self._dirty = False
+            try:
+                self._write_data(data)
+            except Exception:
+                # Keep the changes pending so the next flush retries them
+                with self._lock:
+                    self._dirty = True
+                raise
 
 
 class TaskStorage(JSONStorage):
-    """Storage for tasks."""
+    """Storage for tasks.
+    
+    Tasks are loaded once and kept in memory, keyed by id, with secondary
+    indexes on the filterable fields. Mutations update the indexes and mark
+    the storage dirty; the file is rewritten on the next flush().
+    
+    ``_by_id`` keeps tasks in creation (file) order, and every query returns
+    them in that order, however the index buckets happen to be ordered.
+    """
+    
+    INDEXED_FIELDS = ('column', 'priority', 'category')
+    
+    def __init__(self, persist: bool = True, file_path: Path = TASKS_FILE):
+        self._by_id: Dict[str, Dict] = {}
+        self._order: Dict[str, int] = {}
+        self._next_order = 0
+        self._indexes: Dict[str, Dict[str, Dict[str, Dict]]] = {}
+        super().__init__(file_path, persist)
+    
+    def _load(self):
+        """Build the id map and field indexes from the JSON file."""
+        self._reset()
+        # Validate once on load; the cache then holds native Python values
+        for task in _TASK_LIST_ADAPTER.validate_python(self._read_data()):
+            self._put(task.model_dump())
+    
+    def _reset(self):
+        """Empty the id map and field indexes."""
+        self._by_id = {}
+        self._order = {}
+        self._next_order = 0
+        self._indexes = {field: defaultdict(dict) for field in self.INDEXED_FIELDS}
     
-    def __init__(self):
-        super().__init__(TASKS_FILE)
+    def _put(self, item: Dict):
+        """Insert or replace a task in the id map and indexes."""
+        existing = self._by_id.get(item['id'])
+        if existing is not None:
+            self._unindex(existing)
+        else:
+            self._order[item['id']] = self._next_order
+            self._next_order += 1
+        self._by_id[item['id']] = item
+        self._index(item)
     
+    def _index(self, item: Dict, fields: Sequence[str] = INDEXED_FIELDS):
+        """Add a task to the given field indexes."""
+        for field in fields:
+            value = item.get(field)
+            if value is not None:
+                self._indexes[field][value][item['id']] = item
+    
+    def _unindex(self, item: Dict, fields: Sequence[str] = INDEXED_FIELDS):
+        """Remove a task from the given field indexes."""
+        for field in fields:
+            value = item.get(field)
+            bucket = self._indexes[field].get(value)
+            if bucket is not None:
+                bucket.pop(item['id'], None)
+                if not bucket:
+                    del self._indexes[field][value]
+    
+    def _snapshot(self) -> List[Dict]:
+        """Return a copy of all tasks in file order."""
+        return [dict(item) for item in self._by_id.values()]
+    
+    # model_construct skips validation, which is only safe because every
+    # cached item was validated on load or came from a validated Task. Never
+    # use it for data that arrives from the API.
     def get_all(self) -> List[Task]:
         """Get all tasks."""
-        data = self._read_data()
-        return [Task(**item) for item in data]
+        return [Task.model_construct(**item) for item in list(self._by_id.values())]
     
     def get_by_id(self, task_id: str) -> Optional[Task]:
         """Get a task by ID."""
-        tasks = self.get_all()
-        for task in tasks:
-            if task.id == task_id:
-                return task
-        return None
+        item = self._by_id.get(task_id)
+        return Task.model_construct(**item) if item is not None else None
     
     def get_by_column(self, column: str) -> List[Task]:
         """Get all tasks in a column."""
-        tasks = self.get_all()
-        return [t for t in tasks if t.column == column]
+        return self.filter(column=column)
+    
+    def filter(
+        self,
+        column: Optional[str] = None,
+        priority: Optional[str] = None,
+        category: Optional[str] = None
+    ) -> List[Task]:
+        """Get tasks matching all of the given field values.
+        
+        Empty or None values are not filtered on. Only the smallest matching
+        index bucket is scanned, checking every criterion in a single pass.
+        """
+        column, priority, category = column or None, priority or None, category or None
+        buckets = [
+            self._indexes[field].get(value, {})
+            for field, value in (('column', column), ('priority', priority), ('category', category))
+            if value is not None
+        ]
+        if not buckets:
+            return self.get_all()
+        matches = [
+            item for item in list(min(buckets, key=len).values())
+            if (column is None or item['column'] == column)
+            and (priority is None or item['priority'] == priority)
+            and (category is None or item['category'] == category)
+        ]
+        # Buckets are ordered by when a task entered them; restore creation order
+        order = self._order
+        matches.sort(key=lambda item: order.get(item['id'], 0))
+        return [Task.model_construct(**item) for item in matches]
     
     def create(self, task: Task) -> Task:
         """Create a new task."""
-        data = self._read_data()
-        task_dict = task.model_dump()
-        # Convert datetime objects to ISO format strings
-        for key in ['created_at', 'updated_at', 'due_date']:
-            if task_dict.get(key) and isinstance(task_dict[key], datetime):
-                task_dict[key] = task_dict[key].isoformat()
-        data.append(task_dict)
-        self._write_data(data)
+        item = task.model_dump()
+        with self._lock:
+            self._put(item)
+            self._mark_dirty()
         return task
     
     def update(self, task_id: str, updates: Dict) -> Optional[Task]:
         """Update a task."""
-        data = self._read_data()
-        for i, item in enumerate(data):
-            if item['id'] == task_id:
-                # Apply updates
-                for key, value in updates.items():
-                    if value is not None:
-                        if isinstance(value, datetime):
-                            item[key] = value.isoformat()
-                        else:
-                            item[key] = value
-                item['updated_at'] = datetime.utcnow().isoformat()
-                self._write_data(data)
-                return Task(**item)
-        return None
+        changes = {key: value for key, value in updates.items() if value is not None}
+        changes['updated_at'] = utcnow()
+        with self._lock:
+            item = self._by_id.get(task_id)
+            if item is None:
+                return None
+            # Only re-bucket the indexed fields whose value actually changes
+            rebucket = [f for f in self.INDEXED_FIELDS if f in changes and changes[f] != item.get(f)]
+            self._unindex(item, rebucket)
+            item.update(changes)
+            self._index(item, rebucket)
+            self._mark_dirty()
+            return Task.model_construct(**item)
     
     def delete(self, task_id: str) -> bool:
         """Delete a task."""
-        data = self._read_data()
-        original_len = len(data)
-        data = [item for item in data if item['id'] != task_id]
-        if len(data) < original_len:
-            self._write_data(data)
-            return True
-        return False
+        with self._lock:
+            item = self._by_id.pop(task_id, None)
+            if item is None:
+                return False
+            self._order.pop(task_id, None)
+            self._unindex(item)
+            self._mark_dirty()
+        return True
     
     def move(self, task_id: str, column: str, position: Optional[int] = None) -> Optional[Task]:
         """Move a task to a different column."""
         return self.update(task_id, {'column': column})
+    
+    def clear(self):
+        """Delete all tasks."""
+        with self._lock:
+            self._reset()
+            self._mark_dirty()
 
 
 class UserStorage(JSONStorage):
-    """Storage for users."""
+    """Storage for users, kept in memory keyed by username."""
+    
+    def __init__(self, persist: bool = True, file_path: Path = USERS_FILE):
+        self._users: Dict[str, Dict] = {}
+        super().__init__(file_path, persist)
+    
+    def _load(self):
+        """Build the username map from the JSON file."""
+        self._users = {item['username']: item for item in self._read_data()}
     
-    def __init__(self):
-        super().__init__(USERS_FILE)
+    def _snapshot(self) -> List[Dict]:
+        """Return a copy of all users in file order."""
+        return [dict(item) for item in self._users.values()]
     
     def get_by_username(self, username: str) -> Optional[User]:
         """Get a user by username."""
-        data = self._read_data()
-        for item in data:
-            if item['username'] == username:
-                return User(**item)
-        return None
+        item = self._users.get(username)
+        return User.model_construct(**item) if item is not None else None
     
     def create(self, user: User) -> User:
         """Create a new user."""
-        data = self._read_data()
-        data.append(user.model_dump())
-        self._write_data(data)
+        item = user.model_dump()
+        with self._lock:
+            self._users[user.username] = item
+            self._mark_dirty()
         return user
     
+    def create_many(self, users: List[User]) -> List[User]:
+        """Create several users in a single change."""
+        items = {user.username: user.model_dump() for user in users}
+        with self._lock:
+            self._users.update(items)
+            self._mark_dirty()
+        return users
+    
     def exists(self, username: str) -> bool:
         """Check if a user exists."""
-        return self.get_by_username(username) is not None
+        return username in self._users
     
     def update(self, user: User) -> User:
         """Update an existing user."""
-        data = self._read_data()
-        for i, item in enumerate(data):
-            if item['username'] == user.username:
-                data[i] = user.model_dump()
-                self._write_data(data)
-                return user
-        raise ValueError(f"User {user.username} not found")
+        item = user.model_dump()
+        with self._lock:
+            if user.username not in self._users:
+                raise ValueError(f"User {user.username} not found")
+            self._users[user.username] = item
+            self._mark_dirty()
+        return user
     
     def list_all(self) -> list:
         """List all users."""
-        data = self._read_data()
-        return [User(**item) for item in data]
+        return [User.model_construct(**item) for item in list(self._users.values())]
     
     def delete(self, username: str) -> bool:
         """Delete a user by username."""
-        data = self._read_data()
-        new_data = [item for item in data if item['username'] != username]
-        if len(new_data) == len(data):
-            return False
-        self._write_data(new_data)
+        with self._lock:
+            if self._users.pop(username, None) is None:
+                return False
+            self._mark_dirty()
         return True
+    
+    def clear(self):
+        """Delete all users."""
+        with self._lock:
+            self._users = {}
+            self._mark_dirty()
 
 
 class CategoryStorage(JSONStorage):
-    """Storage for categories."""
+    """Storage for categories, kept in memory as a set of names."""
+    
+    def __init__(self, persist: bool = True, file_path: Path = CATEGORIES_FILE):
+        self._categories: Set[str] = set()
+        super().__init__(file_path, persist)
+    
+    def _load(self):
+        """Build the category set from the JSON file."""
+        self._categories = set(self._read_data())
     
-    def __init__(self):
-        super().__init__(CATEGORIES_FILE)
+    def _snapshot(self) -> List[str]:
+        """Return all categories in sorted order."""
+        return sorted(self._categories)
     
     def get_all(self) -> List[str]:
         """Get all categories."""
-        data = self._read_data()
-        return sorted(data)
+        return sorted(self._categories)
     
     def add(self, category: str) -> bool:
         """Add a new category."""
-        data = self._read_data()
-        if category not in data:
-            data.append(category)
-            self._write_data(sorted(data))
-            return True
-        return False
+        with self._lock:
+            if category in self._categories:
+                return False
+            self._categories.add(category)
+            self._mark_dirty()
+        return True
     
     def delete(self, category: str) -> bool:
         """Delete a category."""
-        data = self._read_data()
-        if category in data:
-            data.remove(category)
-            self._write_data(data)
-            return True
-        return False
+        with self._lock:
+            if category not in self._categories:
+                return False
+            self._categories.discard(category)
+            self._mark_dirty()
+        return True
     
     def exists(self, category: str) -> bool:
         """Check if a category exists."""
-        return category in self._read_data()
+        return category in self._categories
+    
+    def clear(self):
+        """Delete all categories."""
+        with self._lock:
+            self._categories = set()
+            self._mark_dirty()
 
 
 # Singleton instances
 task_storage = TaskStorage()
 user_storage = UserStorage()
 category_storage = CategoryStorage()
+
+
+def flush_all():
+    """Flush every storage with pending changes.
+    
+    A failing storage does not stop the others from being flushed; the first
+    error is raised once every storage has been tried.
+    """
+    error = None
+    for storage in (task_storage, user_storage, category_storage):
+        try:
+            storage.flush()
+        except Exception as exc:
+            if error is None:
+                error = exc
+    if error is not None:
+        raise error
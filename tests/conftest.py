@@ -1,31 +1,109 @@
 """Pytest fixtures for Kanban board tests."""
 
 import os
+import sys
 import tempfile
+import bcrypt
+import httpx
+import orjson
 import pytest
+import pytest_asyncio
+from asgi_lifespan import LifespanManager
 from fastapi.testclient import TestClient
+from httpx import AsyncClient, ASGITransport
 
-# Set test environment before importing app
-os.environ["KANBAN_DATA_DIR"] = tempfile.mkdtemp()
+# Set test environment before importing app; each xdist worker gets its own data dir
+_worker = os.environ.get("PYTEST_XDIST_WORKER", "main")
+os.environ["KANBAN_DATA_DIR"] = tempfile.mkdtemp(prefix=f"kanban-{_worker}-")
 os.environ["KANBAN_SECRET_KEY"] = "test-secret-key-for-testing-only"
 os.environ["KANBAN_ADMIN_USERNAME"] = "testadmin"
 os.environ["KANBAN_ADMIN_PASSWORD"] = "testpass123"
 
-from app.main import app
-from app.auth import get_password_hash, create_access_token
-from app.storage import user_storage, task_storage
+from app.main import app as kanban_app
+from app.config import DATA_DIR, TASKS_FILE, USERS_FILE, CATEGORIES_FILE
+from app.auth import _token_cache, get_password_hash, create_access_token
+from app.storage import user_storage, task_storage, category_storage
 from app.models import User, Task
 
 
-@pytest.fixture
-def client():
-    """Create a test client."""
-    return TestClient(app)
+def pytest_unconfigure(config):
+    """Remove this process's data directory once the run finishes."""
+    # The directory only ever holds the storage files, so skip a tree walk
+    for path in (TASKS_FILE, USERS_FILE, CATEGORIES_FILE):
+        path.unlink(missing_ok=True)
+    try:
+        DATA_DIR.rmdir()
+    except OSError:
+        pass
 
 
-@pytest.fixture
+@pytest.fixture(scope="session", name="app")
+def app_fixture():
+    """Provide the application, built once at import, to the whole session."""
+    return kanban_app
+
+
+@pytest.fixture(scope="session")
+def client(app):
+    """Create a test client shared by the whole session.
+    
+    Per-test state lives in the storage singletons, which the function-scoped
+    cleanup fixtures reset, so the client itself can be reused. Requests run on
+    uvloop where it is available, matching how the app is served.
+    """
+    # uvloop is not installed on Windows, where anyio would look for winloop
+    use_uvloop = sys.platform != "win32"
+    return TestClient(app, backend="asyncio", backend_options={"use_uvloop": use_uvloop})
+
+
+@pytest.fixture(scope="session", autouse=True)
+def fast_password_hashing():
+    """Hash passwords at bcrypt's minimum cost; tests don't need real strength."""
+    gensalt = bcrypt.gensalt
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(bcrypt, "gensalt", lambda rounds=4, prefix=b"2b": gensalt(4, prefix))
+        yield
+
+
+@pytest.fixture(scope="session", autouse=True)
+def in_memory_storage():
+    """Keep the storage singletons in memory; flushes become no-ops.
+    
+    Tests that exercise the file layer build their own storages on tmp_path.
+    """
+    with pytest.MonkeyPatch.context() as mp:
+        for storage in (user_storage, category_storage, task_storage):
+            mp.setattr(storage, "persist", False)
+        yield
+
+
+@pytest.fixture(scope="session", autouse=True)
+def fast_json_parsing():
+    """Parse test response bodies with orjson instead of the stdlib json module."""
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(httpx.Response, "json", lambda self, **kwargs: orjson.loads(self.content))
+        yield
+
+
+@pytest_asyncio.fixture(scope="session")
+async def async_client(app):
+    """Create an async test client shared by the whole session.
+    
+    Startup and shutdown run once around the session; ASGITransport does not
+    send lifespan events itself.
+    """
+    async with LifespanManager(app):
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            yield client
+
+
+@pytest.fixture(scope="session")
 def auth_headers():
-    """Get authentication headers with valid token."""
+    """Get authentication headers with a token valid for the whole session.
+    
+    The token only names the user; tests that need testadmin to exist also
+    request ``test_user``.
+    """
     token = create_access_token(data={"sub": "testadmin"})
     return {"Authorization": f"Bearer {token}"}
 
@@ -43,26 +121,44 @@ def test_user():
     return user_storage.get_by_username("testadmin")
 
 
-@pytest.fixture
-def sample_task():
-    """Create a sample task for testing."""
-    task = Task(
+@pytest.fixture(scope="module")
+def sample_task_model():
+    """Build the sample task once per module."""
+    return Task(
         title="Test Task",
         description="Test description",
         priority="Medium",
         category="Testing",
         column="Backlog"
     )
-    return task_storage.create(task)
+
+
+@pytest.fixture
+def sample_task(sample_task_model):
+    """Store the sample task for testing.
+    
+    Storage keeps its own copy of the task, and cleanup_tasks empties it after
+    every test, so mutating tests cannot leak changes into the next one.
+    """
+    return task_storage.create(sample_task_model)
+
+
+@pytest.fixture
+def clean_data():
+    """Empty the storage singletons in memory before and after the test."""
+    storages = (user_storage, category_storage, task_storage)
+    for storage in storages:
+        storage.clear()
+    _token_cache.clear()
+    yield
+    for storage in storages:
+        storage.clear()
+    _token_cache.clear()
 
 
 @pytest.fixture(autouse=True)
 def cleanup_tasks():
-    """Clean up tasks before each test."""
-    # Clear all tasks before test
-    for task in task_storage.get_all():
-        task_storage.delete(task.id)
+    """Clean up tasks before and after each test."""
+    task_storage.clear()
     yield
-    # Clean up after test
-    for task in task_storage.get_all():
-        task_storage.delete(task.id)
+    task_storage.clear()
@@ -2,6 +2,8 @@
 
 import pytest
 
+from app import auth
+
 
 class TestAuthentication:
     """Test authentication functionality."""
@@ -41,11 +43,6 @@ class TestAuthentication:
         data = response.json()
         assert data["username"] == "testadmin"
     
-    def test_get_me_unauthenticated(self, client):
-        """Test getting current user info without authentication."""
-        response = client.get("/api/auth/me")
-        assert response.status_code == 401
-    
     def test_get_me_invalid_token(self, client):
         """Test getting current user info with invalid token."""
         response = client.get(
@@ -82,10 +79,9 @@ class TestAuthentication:
         assert response.status_code == 400
         assert "already registered" in response.json()["detail"]
     
-    def test_register_unauthenticated(self, client):
-        """Test registering without authentication."""
-        response = client.post(
-            "/api/auth/register",
-            json={"username": "newuser", "password": "newpass123"}
-        )
-        assert response.status_code == 401
+    def test_ensure_default_admin_skips_existing(self, test_user, monkeypatch):
+        """Test that an existing admin is not re-hashed on startup."""
+        def fail(password):
+            raise AssertionError("password should not be hashed")
+        monkeypatch.setattr(auth, "get_password_hash", fail)
+        auth.ensure_default_admin()
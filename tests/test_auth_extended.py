@@ -1,194 +1,209 @@
 """Extended authentication tests for new features."""
 
+import orjson
 import pytest
-from httpx import AsyncClient, ASGITransport
-from app.main import app
-from app.storage import user_storage, DATA_DIR
+from httpx import AsyncClient
+from app.storage import user_storage
 from app.auth import get_password_hash
 from app.models import User
-import shutil
 
 
-@pytest.fixture(autouse=True)
-def clean_data():
-    """Clean up data before and after each test."""
-    if DATA_DIR.exists():
-        shutil.rmtree(DATA_DIR)
-    DATA_DIR.mkdir(parents=True, exist_ok=True)
-    yield
-    if DATA_DIR.exists():
-        shutil.rmtree(DATA_DIR)
+pytestmark = pytest.mark.usefixtures("clean_data")
 
 
-@pytest.fixture
-def admin_user():
-    """Create an admin user."""
-    user = User(
+def build_admin() -> User:
+    """Build the admin user without storing it."""
+    return User(
         username="admin",
         hashed_password=get_password_hash("adminpass"),
         disabled=False,
         is_admin=True
     )
-    user_storage.create(user)
-    return user
 
 
-@pytest.fixture
-def regular_user():
-    """Create a regular (non-admin) user."""
-    user = User(
+def build_regular() -> User:
+    """Build a regular (non-admin) user without storing it."""
+    return User(
         username="testuser",
         hashed_password=get_password_hash("testpass"),
         disabled=False,
         is_admin=False
     )
-    user_storage.create(user)
-    return user
+
+
+@pytest.fixture
+def admin_user():
+    """Create an admin user."""
+    return user_storage.create(build_admin())
+
+
+@pytest.fixture
+def two_users():
+    """Create the admin and a regular user in one storage write."""
+    admin, regular = build_admin(), build_regular()
+    user_storage.create_many([admin, regular])
+    return admin, regular
+
+
+# Request bodies serialized once at import instead of on every request
+_CHANGE_PW_BODY = orjson.dumps({"current_password": "adminpass", "new_password": "newpassword123"})
+_WRONG_CURRENT_BODY = orjson.dumps({"current_password": "wrongpassword", "new_password": "newpassword123"})
+_TOO_SHORT_BODY = orjson.dumps({"current_password": "adminpass", "new_password": "short"})
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+
+def json_auth_headers(token: str) -> dict:
+    """Headers for sending a pre-serialized JSON body with a token."""
+    return {**_JSON_HEADERS, "Authorization": f"Bearer {token}"}
+
+
+# Tokens stay valid for the whole session: credentials and signing key are fixed
+_tokens = {}
 
 
 async def get_token(client: AsyncClient, username: str, password: str) -> str:
-    """Helper to get auth token."""
-    response = await client.post(
-        "/api/auth/token",
-        data={"username": username, "password": password}
-    )
-    return response.json()["access_token"]
+    """Helper to get auth token, logging in once per credentials."""
+    key = (username, password)
+    if key not in _tokens:
+        response = await client.post(
+            "/api/auth/token",
+            data={"username": username, "password": password}
+        )
+        _tokens[key] = response.json()["access_token"]
+    return _tokens[key]
 
 
 @pytest.mark.asyncio
 class TestPasswordChange:
     """Tests for password change functionality."""
 
-    async def test_change_password_success(self, admin_user):
+    async def test_change_password_success(self, async_client, admin_user):
         """Test successful password change."""
-        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
-            token = await get_token(client, "admin", "adminpass")
-            
-            response = await client.post(
-                "/api/auth/change-password",
-                headers={"Authorization": f"Bearer {token}"},
-                json={"current_password": "adminpass", "new_password": "newpassword123"}
-            )
-            
-            assert response.status_code == 200
-            assert response.json()["message"] == "Password changed successfully"
-            
-            # Verify new password works
-            new_token = await get_token(client, "admin", "newpassword123")
-            assert new_token is not None
-
-    async def test_change_password_wrong_current(self, admin_user):
-        """Test password change with wrong current password."""
-        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
-            token = await get_token(client, "admin", "adminpass")
-            
-            response = await client.post(
-                "/api/auth/change-password",
-                headers={"Authorization": f"Bearer {token}"},
-                json={"current_password": "wrongpassword", "new_password": "newpassword123"}
-            )
-            
-            assert response.status_code == 400
-            assert "incorrect" in response.json()["detail"].lower()
-
-    async def test_change_password_too_short(self, admin_user):
-        """Test password change with too short new password."""
-        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
-            token = await get_token(client, "admin", "adminpass")
-            
-            response = await client.post(
-                "/api/auth/change-password",
-                headers={"Authorization": f"Bearer {token}"},
-                json={"current_password": "adminpass", "new_password": "short"}
-            )
-            
-            assert response.status_code == 422  # Validation error
-
-    async def test_change_password_unauthenticated(self):
-        """Test password change without authentication."""
-        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
-            response = await client.post(
-                "/api/auth/change-password",
-                json={"current_password": "test", "new_password": "newpassword123"}
-            )
-            
-            assert response.status_code == 401
+        token = await get_token(async_client, "admin", "adminpass")
+        
+        response = await async_client.post(
+            "/api/auth/change-password",
+            headers=json_auth_headers(token),
+            content=_CHANGE_PW_BODY
+        )
+        
+        assert response.status_code == 200
+        assert response.json()["message"] == "Password changed successfully"
+        _tokens.pop(("admin", "adminpass"), None)
+        
+        # Verify new password works
+        new_token = await get_token(async_client, "admin", "newpassword123")
+        assert new_token is not None
+
+    @pytest.mark.parametrize("body,expected,detail_substr", [
+        (_WRONG_CURRENT_BODY, 400, "incorrect"),
+        (_TOO_SHORT_BODY, 422, None),  # Validation error
+    ], ids=["wrong_current", "too_short"])
+    async def test_change_password_rejected(self, async_client, admin_user, body, expected, detail_substr):
+        """Test password changes that must be refused."""
+        token = await get_token(async_client, "admin", "adminpass")
+        
+        response = await async_client.post(
+            "/api/auth/change-password",
+            headers=json_auth_headers(token),
+            content=body
+        )
+        
+        assert response.status_code == expected
+        if detail_substr:
+            assert detail_substr in response.json()["detail"].lower()
 
 
 @pytest.mark.asyncio
 class TestUserManagement:
     """Tests for user management (admin only)."""
 
-    async def test_list_users_as_admin(self, admin_user, regular_user):
+    async def test_list_users_as_admin(self, async_client, two_users):
         """Test listing users as admin."""
-        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
-            token = await get_token(client, "admin", "adminpass")
-            
-            response = await client.get(
-                "/api/auth/users",
-                headers={"Authorization": f"Bearer {token}"}
-            )
-            
-            assert response.status_code == 200
-            users = response.json()["users"]
-            assert len(users) == 2
-            usernames = [u["username"] for u in users]
-            assert "admin" in usernames
-            assert "testuser" in usernames
-
-    async def test_list_users_as_non_admin(self, admin_user, regular_user):
+        token = await get_token(async_client, "admin", "adminpass")
+        
+        response = await async_client.get(
+            "/api/auth/users",
+            headers={"Authorization": f"Bearer {token}"}
+        )
+        
+        assert response.status_code == 200
+        users = response.json()["users"]
+        assert len(users) == 2
+        usernames = [u["username"] for u in users]
+        assert "admin" in usernames
+        assert "testuser" in usernames
+
+    async def test_list_users_as_non_admin(self, async_client, two_users):
         """Test listing users as non-admin (should fail)."""
-        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
-            token = await get_token(client, "testuser", "testpass")
-            
-            response = await client.get(
-                "/api/auth/users",
-                headers={"Authorization": f"Bearer {token}"}
-            )
-            
-            assert response.status_code == 403
-
-    async def test_delete_user_as_admin(self, admin_user, regular_user):
+        token = await get_token(async_client, "testuser", "testpass")
+        
+        response = await async_client.get(
+            "/api/auth/users",
+            headers={"Authorization": f"Bearer {token}"}
+        )
+        
+        assert response.status_code == 403
+
+    async def test_delete_user_as_admin(self, async_client, two_users):
         """Test deleting a user as admin."""
-        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
-            token = await get_token(client, "admin", "adminpass")
-            
-            response = await client.delete(
-                "/api/auth/users/testuser",
-                headers={"Authorization": f"Bearer {token}"}
-            )
-            
-            assert response.status_code == 200
-            
-            # Verify user is deleted
-            assert not user_storage.exists("testuser")
-
-    async def test_delete_user_as_non_admin(self, admin_user, regular_user):
+        token = await get_token(async_client, "admin", "adminpass")
+        
+        response = await async_client.delete(
+            "/api/auth/users/testuser",
+            headers={"Authorization": f"Bearer {token}"}
+        )
+        
+        assert response.status_code == 200
+        
+        # Verify user is deleted
+        assert not user_storage.exists("testuser")
+
+    async def test_deleted_user_token_rejected(self, async_client, two_users):
+        """Test that a deleted user's token stops working immediately."""
+        user_token = await get_token(async_client, "testuser", "testpass")
+        response = await async_client.get(
+            "/api/auth/me",
+            headers={"Authorization": f"Bearer {user_token}"}
+        )
+        assert response.status_code == 200
+        
+        admin_token = await get_token(async_client, "admin", "adminpass")
+        await async_client.delete(
+            "/api/auth/users/testuser",
+            headers={"Authorization": f"Bearer {admin_token}"}
+        )
+        
+        response = await async_client.get(
+            "/api/auth/me",
+            headers={"Authorization": f"Bearer {user_token}"}
+        )
+        assert response.status_code == 401
+
+    async def test_delete_user_as_non_admin(self, async_client, two_users):
         """Test deleting a user as non-admin (should fail)."""
-        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
-            token = await get_token(client, "testuser", "testpass")
-            
-            response = await client.delete(
-                "/api/auth/users/admin",
-                headers={"Authorization": f"Bearer {token}"}
-            )
-            
-            assert response.status_code == 403
-
-    async def test_cannot_delete_admin(self, admin_user):
+        token = await get_token(async_client, "testuser", "testpass")
+        
+        response = await async_client.delete(
+            "/api/auth/users/admin",
+            headers={"Authorization": f"Bearer {token}"}
+        )
+        
+        assert response.status_code == 403
+
+    async def test_cannot_delete_admin(self, async_client, admin_user):
         """Test that admin user cannot be deleted."""
-        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
-            token = await get_token(client, "admin", "adminpass")
-            
-            response = await client.delete(
-                "/api/auth/users/admin",
-                headers={"Authorization": f"Bearer {token}"}
-            )
-            
-            assert response.status_code == 400
-            assert "Cannot delete admin" in response.json()["detail"]
-
-    async def test_cannot_delete_self(self, admin_user, regular_user):
+        token = await get_token(async_client, "admin", "adminpass")
+        
+        response = await async_client.delete(
+            "/api/auth/users/admin",
+            headers={"Authorization": f"Bearer {token}"}
+        )
+        
+        assert response.status_code == 400
+        assert "Cannot delete admin" in response.json()["detail"]
+
+    async def test_cannot_delete_self(self, async_client, two_users):
         """Test that users cannot delete themselves."""
         # Create another admin to test this
         admin2 = User(
@@ -199,49 +214,66 @@ class TestUserManagement:
         )
         user_storage.create(admin2)
         
-        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
-            token = await get_token(client, "admin2", "admin2pass")
-            
-            response = await client.delete(
-                "/api/auth/users/admin2",
-                headers={"Authorization": f"Bearer {token}"}
-            )
-            
-            assert response.status_code == 400
-            assert "Cannot delete yourself" in response.json()["detail"]
-
-    async def test_delete_nonexistent_user(self, admin_user):
+        token = await get_token(async_client, "admin2", "admin2pass")
+        
+        response = await async_client.delete(
+            "/api/auth/users/admin2",
+            headers={"Authorization": f"Bearer {token}"}
+        )
+        
+        assert response.status_code == 400
+        assert "Cannot delete yourself" in response.json()["detail"]
+
+    async def test_delete_nonexistent_user(self, async_client, admin_user):
         """Test deleting a user that doesn't exist."""
-        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
-            token = await get_token(client, "admin", "adminpass")
-            
-            response = await client.delete(
-                "/api/auth/users/nonexistent",
-                headers={"Authorization": f"Bearer {token}"}
-            )
-            
-            assert response.status_code == 404
+        token = await get_token(async_client, "admin", "adminpass")
+        
+        response = await async_client.delete(
+            "/api/auth/users/nonexistent",
+            headers={"Authorization": f"Bearer {token}"}
+        )
+        
+        assert response.status_code == 404
 
 
 @pytest.mark.asyncio  
 class TestAdminFlag:
     """Tests for is_admin functionality."""
 
-    async def test_me_returns_admin_flag(self, admin_user, regular_user):
+    async def test_me_returns_admin_flag(self, async_client, two_users):
         """Test that /me endpoint returns is_admin flag."""
-        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
-            # Test admin user
-            admin_token = await get_token(client, "admin", "adminpass")
-            response = await client.get(
-                "/api/auth/me",
-                headers={"Authorization": f"Bearer {admin_token}"}
-            )
-            assert response.json()["is_admin"] == True
-            
-            # Test regular user
-            user_token = await get_token(client, "testuser", "testpass")
-            response = await client.get(
-                "/api/auth/me",
-                headers={"Authorization": f"Bearer {user_token}"}
-            )
-            assert response.json()["is_admin"] == False
+        # Test admin user
+        admin_token = await get_token(async_client, "admin", "adminpass")
+        response = await async_client.get(
+            "/api/auth/me",
+            headers={"Authorization": f"Bearer {admin_token}"}
+        )
+        assert response.json()["is_admin"] == True
+        
+        # Test regular user
+        user_token = await get_token(async_client, "testuser", "testpass")
+        response = await async_client.get(
+            "/api/auth/me",
+            headers={"Authorization": f"Bearer {user_token}"}
+        )
+        assert response.json()["is_admin"] == False
+
+
+@pytest.mark.asyncio
+class TestUnauthenticated:
+    """Tests for protected endpoints without a token."""
+
+    @pytest.mark.parametrize("method,url", [
+        ("GET", "/api/auth/me"),
+        ("POST", "/api/auth/register"),
+        ("POST", "/api/auth/change-password"),
+        ("GET", "/api/auth/users"),
+        ("DELETE", "/api/auth/users/testuser"),
+        ("GET", "/api/tasks/categories"),
+        ("POST", "/api/tasks/categories?name=Test"),
+        ("DELETE", "/api/tasks/categories/Test"),
+    ])
+    async def test_endpoint_unauthenticated(self, async_client, method, url):
+        """Test that the endpoint rejects requests without a token."""
+        async with async_client.stream(method, url) as response:
+            assert response.status_code == 401
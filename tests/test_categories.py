@@ -1,23 +1,13 @@
 """Tests for category management."""
 
 import pytest
-from httpx import AsyncClient, ASGITransport
-from app.main import app
-from app.storage import user_storage, category_storage, task_storage, DATA_DIR
+from httpx import AsyncClient
+from app.storage import CategoryStorage, user_storage, category_storage, task_storage
 from app.auth import get_password_hash
 from app.models import User, Task
-import shutil
 
 
-@pytest.fixture(autouse=True)
-def clean_data():
-    """Clean up data before and after each test."""
-    if DATA_DIR.exists():
-        shutil.rmtree(DATA_DIR)
-    DATA_DIR.mkdir(parents=True, exist_ok=True)
-    yield
-    if DATA_DIR.exists():
-        shutil.rmtree(DATA_DIR)
+pytestmark = pytest.mark.usefixtures("clean_data")
 
 
 @pytest.fixture
@@ -33,16 +23,22 @@ def test_user():
     return user
 
 
+# Tokens stay valid for the whole session: credentials and signing key are fixed
+_tokens = {}
+
+
 async def get_token(client: AsyncClient, username: str, password: str) -> str:
-    """Helper to get auth token."""
-    response = await client.post(
-        "/api/auth/token",
-        data={"username": username, "password": password}
-    )
-    return response.json()["access_token"]
+    """Helper to get auth token, logging in once per credentials."""
+    key = (username, password)
+    if key not in _tokens:
+        response = await client.post(
+            "/api/auth/token",
+            data={"username": username, "password": password}
+        )
+        _tokens[key] = response.json()["access_token"]
+    return _tokens[key]
 
 
-@pytest.mark.asyncio
 class TestCategoryStorage:
     """Tests for CategoryStorage class."""
 
@@ -81,103 +77,77 @@ class TestCategoryStorage:
         assert category_storage.exists("Work")
         assert not category_storage.exists("Personal")
 
+    def test_flush_persists_categories(self, tmp_path):
+        """Test that categories reach disk once flushed."""
+        storage = CategoryStorage(file_path=tmp_path / "categories.json")
+        storage.add("Work")
+        storage.flush()
+        assert CategoryStorage(file_path=storage.file_path).get_all() == ["Work"]
+
 
 @pytest.mark.asyncio
 class TestCategoryEndpoints:
     """Tests for category API endpoints."""
 
-    async def test_get_categories_empty(self, test_user):
+    async def test_get_categories_empty(self, async_client, test_user):
         """Test getting categories when none exist."""
-        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
-            token = await get_token(client, "testuser", "testpass")
-            
-            response = await client.get(
-                "/api/tasks/categories",
-                headers={"Authorization": f"Bearer {token}"}
-            )
-            
-            assert response.status_code == 200
-            assert response.json()["categories"] == []
-
-    async def test_create_category(self, test_user):
-        """Test creating a category."""
-        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
-            token = await get_token(client, "testuser", "testpass")
-            
-            response = await client.post(
-                "/api/tasks/categories?name=Work",
-                headers={"Authorization": f"Bearer {token}"}
-            )
-            
-            assert response.status_code == 200
-            assert response.json()["category"] == "Work"
-
-    async def test_create_category_strips_whitespace(self, test_user):
-        """Test that category names are trimmed."""
-        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
-            token = await get_token(client, "testuser", "testpass")
-            
-            response = await client.post(
-                "/api/tasks/categories?name=  Work  ",
-                headers={"Authorization": f"Bearer {token}"}
-            )
-            
-            assert response.status_code == 200
-            assert response.json()["category"] == "Work"
-
-    async def test_create_category_empty_name(self, test_user):
-        """Test creating a category with empty name."""
-        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
-            token = await get_token(client, "testuser", "testpass")
-            
-            response = await client.post(
-                "/api/tasks/categories?name=   ",
-                headers={"Authorization": f"Bearer {token}"}
-            )
-            
-            assert response.status_code == 400
-
-    async def test_create_category_too_long(self, test_user):
-        """Test creating a category with name too long."""
-        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
-            token = await get_token(client, "testuser", "testpass")
-            
-            long_name = "x" * 51
-            response = await client.post(
-                f"/api/tasks/categories?name={long_name}",
-                headers={"Authorization": f"Bearer {token}"}
-            )
-            
-            assert response.status_code == 400
-
-    async def test_delete_category(self, test_user):
+        token = await get_token(async_client, "testuser", "testpass")
+        
+        response = await async_client.get(
+            "/api/tasks/categories",
+            headers={"Authorization": f"Bearer {token}"}
+        )
+        
+        assert response.status_code == 200
+        assert response.json()["categories"] == []
+
+    @pytest.mark.parametrize("name,status,expected", [
+        ("Work", 200, "Work"),
+        ("  Work  ", 200, "Work"),  # Names are trimmed
+        ("   ", 400, None),  # Empty once trimmed
+        ("x" * 50, 200, "x" * 50),
+        ("x" * 51, 400, None),  # Over the 50 char limit
+    ], ids=["valid", "strips_whitespace", "empty_name", "max_length", "too_long"])
+    async def test_create_category(self, async_client, test_user, name, status, expected):
+        """Test creating a category, including name validation."""
+        token = await get_token(async_client, "testuser", "testpass")
+        
+        response = await async_client.post(
+            "/api/tasks/categories",
+            params={"name": name},
+            headers={"Authorization": f"Bearer {token}"}
+        )
+        
+        assert response.status_code == status
+        if expected is not None:
+            assert response.json()["category"] == expected
+
+    async def test_delete_category(self, async_client, test_user):
         """Test deleting a category."""
         category_storage.add("Work")
         
-        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
-            token = await get_token(client, "testuser", "testpass")
-            
-            response = await client.delete(
-                "/api/tasks/categories/Work",
-                headers={"Authorization": f"Bearer {token}"}
-            )
-            
-            assert response.status_code == 200
-            assert not category_storage.exists("Work")
-
-    async def test_delete_nonexistent_category(self, test_user):
+        token = await get_token(async_client, "testuser", "testpass")
+        
+        response = await async_client.delete(
+            "/api/tasks/categories/Work",
+            headers={"Authorization": f"Bearer {token}"}
+        )
+        
+        assert response.status_code == 200
+        assert not category_storage.exists("Work")
+
+    async def test_delete_nonexistent_category(self, async_client, test_user):
         """Test deleting a category that doesn't exist."""
-        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
-            token = await get_token(client, "testuser", "testpass")
-            
-            response = await client.delete(
-                "/api/tasks/categories/Nonexistent",
-                headers={"Authorization": f"Bearer {token}"}
-            )
-            
-            assert response.status_code == 404
-
-    async def test_get_categories_includes_task_categories(self, test_user):
+        token = await get_token(async_client, "testuser", "testpass")
+        
+        response = await async_client.delete(
+            "/api/tasks/categories/Nonexistent",
+            headers={"Authorization": f"Bearer {token}"}
+        )
+        
+        assert response.status_code == 404
+
+    async def test_get_categories_includes_task_categories(self, async_client, test_user):
         """Test that categories from tasks are also returned."""
         # Add a stored category
         category_storage.add("Stored")
@@ -190,27 +160,14 @@ class TestCategoryEndpoints:
         )
         task_storage.create(task)
         
-        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
-            token = await get_token(client, "testuser", "testpass")
-            
-            response = await client.get(
-                "/api/tasks/categories",
-                headers={"Authorization": f"Bearer {token}"}
-            )
-            
-            assert response.status_code == 200
-            categories = response.json()["categories"]
-            assert "Stored" in categories
-            assert "FromTask" in categories
-
-    async def test_categories_unauthenticated(self):
-        """Test accessing categories without authentication."""
-        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
-            response = await client.get("/api/tasks/categories")
-            assert response.status_code == 401
-            
-            response = await client.post("/api/tasks/categories?name=Test")
-            assert response.status_code == 401
-            
-            response = await client.delete("/api/tasks/categories/Test")
-            assert response.status_code == 401
+        token = await get_token(async_client, "testuser", "testpass")
+        
+        response = await async_client.get(
+            "/api/tasks/categories",
+            headers={"Authorization": f"Bearer {token}"}
+        )
+        
+        assert response.status_code == 200
+        categories = response.json()["categories"]
+        assert "Stored" in categories
+        assert "FromTask" in categories
@@ -0,0 +1,89 @@
+"""Tests for application startup and shutdown."""
+
+import asyncio
+import logging
+
+import orjson
+from asgi_lifespan import LifespanManager
+from httpx import AsyncClient, ASGITransport
+
+from app import main
+from app.storage import task_storage
+
+
+class TestLifespan:
+    """Test that the app's lifespan writes tasks to disk."""
+
+    def test_tasks_reach_disk(self, app, auth_headers, test_user, tmp_path, monkeypatch):
+        """Test the periodic flush and the final flush on shutdown."""
+        tasks_file = tmp_path / "tasks.json"
+        monkeypatch.setattr(task_storage, "persist", True)
+        monkeypatch.setattr(task_storage, "file_path", tasks_file)
+        # Startup replaces the session's flush task; put it back afterwards
+        monkeypatch.setattr(app.state, "flush_task", None, raising=False)
+
+        def stored_titles():
+            if not tasks_file.exists():
+                return set()
+            return {item["title"] for item in orjson.loads(tasks_file.read_bytes())}
+
+        async def run_app():
+            async with LifespanManager(app):
+                async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+                    await client.post("/api/tasks", headers=auth_headers, json={"title": "Ticked"})
+                    for _ in range(50):
+                        await asyncio.sleep(main.FLUSH_INTERVAL_SECONDS / 2)
+                        if "Ticked" in stored_titles():
+                            break
+                    assert "Ticked" in stored_titles()
+
+                    # Stop further ticks, letting the one already sleeping finish, so
+                    # the next task can only reach disk through the shutdown flush
+                    interval = main.FLUSH_INTERVAL_SECONDS
+                    monkeypatch.setattr(main, "FLUSH_INTERVAL_SECONDS", 3600)
+                    await asyncio.sleep(interval * 2)
+                    await client.post("/api/tasks", headers=auth_headers, json={"title": "On shutdown"})
+                    assert "On shutdown" not in stored_titles()
+
+        # A private loop: the session loop, and the session client's own flush
+        # task, stay idle while this synchronous test runs
+        loop = asyncio.new_event_loop()
+        try:
+            loop.run_until_complete(run_app())
+        finally:
+            loop.close()
+
+        assert stored_titles() == {"Ticked", "On shutdown"}
+
+    def test_periodic_flush_survives_errors(self, monkeypatch, caplog):
+        """Test that an unexpected flush error is logged and the flusher keeps running."""
+        calls = []
+
+        def flaky_flush_all():
+            calls.append(None)
+            if len(calls) == 1:
+                raise TypeError("not serializable")
+        monkeypatch.setattr(main, "flush_all", flaky_flush_all)
+        monkeypatch.setattr(main, "FLUSH_INTERVAL_SECONDS", 0.01)
+
+        async def run_flusher():
+            task = asyncio.create_task(main._periodic_flush())
+            for _ in range(100):
+                await asyncio.sleep(0.01)
+                if len(calls) >= 2:
+                    break
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+        loop = asyncio.new_event_loop()
+        try:
+            with caplog.at_level(logging.ERROR, logger=main.logger.name):
+                loop.run_until_complete(run_flusher())
+        finally:
+            loop.close()
+
+        assert len(calls) >= 2
+        assert "Failed to flush storage to disk" in caplog.text
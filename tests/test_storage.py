@@ -1,14 +1,13 @@
 """Tests for storage module."""
 
 import pytest
-import tempfile
-import os
+import threading
 from pathlib import Path
 
-# Set up test environment
-os.environ["KANBAN_DATA_DIR"] = tempfile.mkdtemp()
-
-from app.storage import TaskStorage, UserStorage
+from app.storage import (
+    MMAP_THRESHOLD_BYTES, TaskStorage, UserStorage,
+    category_storage, flush_all, task_storage, user_storage,
+)
 from app.models import Task, User
 from app.auth import get_password_hash
 
@@ -18,12 +17,13 @@ class TestTaskStorage:
     
     @pytest.fixture
     def storage(self):
-        """Create a fresh task storage."""
-        storage = TaskStorage()
-        # Clear any existing tasks
-        for task in storage.get_all():
-            storage.delete(task.id)
-        return storage
+        """Create a fresh in-memory task storage."""
+        return TaskStorage(persist=False)
+    
+    @pytest.fixture
+    def persisted_storage(self, tmp_path):
+        """Create a task storage backed by its own data file."""
+        return TaskStorage(file_path=tmp_path / "tasks.json")
     
     def test_create_and_get_task(self, storage):
         """Test creating and retrieving a task."""
@@ -58,7 +58,35 @@ class TestTaskStorage:
         
         backlog_tasks = storage.get_by_column("Backlog")
         assert all(t.column == "Backlog" for t in backlog_tasks)
-    
+
+    def test_filter_multiple_fields(self, storage):
+        """Test filtering tasks on several indexed fields at once."""
+        match = Task(title="Match", column="Backlog", priority="High", category="Work")
+        storage.create(match)
+        storage.create(Task(title="Wrong column", column="Done", priority="High", category="Work"))
+        storage.create(Task(title="Wrong priority", column="Backlog", priority="Low", category="Work"))
+
+        results = storage.filter(column="Backlog", priority="High", category="Work")
+        assert [t.id for t in results] == [match.id]
+
+        storage.move(match.id, "Done")
+        assert storage.filter(column="Backlog", priority="High") == []
+
+    def test_queries_keep_creation_order(self, persisted_storage):
+        """Test that moving a task out and back keeps creation order, before and after reload."""
+        storage = persisted_storage
+        tasks = [storage.create(Task(title=title, column="Backlog", priority="High")) for title in "ABC"]
+        expected = [t.id for t in tasks]
+        
+        storage.move(tasks[0].id, "Done")
+        storage.move(tasks[0].id, "Backlog")
+        assert [t.id for t in storage.get_by_column("Backlog")] == expected
+        assert [t.id for t in storage.filter(column="Backlog", priority="High")] == expected
+        
+        storage.flush()
+        reloaded = TaskStorage(file_path=storage.file_path)
+        assert [t.id for t in reloaded.get_by_column("Backlog")] == expected
+
     def test_update_task(self, storage):
         """Test updating a task."""
         task = Task(title="Original", priority="Low", column="Backlog")
@@ -92,14 +120,89 @@ class TestTaskStorage:
         assert moved is not None
         assert moved.column == "Done"
 
+    def test_clear(self, storage):
+        """Test deleting all tasks at once."""
+        storage.create(Task(title="Task 1", column="Backlog"))
+        storage.create(Task(title="Task 2", column="Done"))
+        
+        storage.clear()
+        
+        assert storage.get_all() == []
+        assert storage.get_by_column("Backlog") == []
+
+    def test_memory_storage_skips_disk(self, storage):
+        """Test that an in-memory storage never writes the data file."""
+        task = Task(title="Unsaved", column="Backlog")
+        storage.create(task)
+        storage.flush()
+        
+        assert TaskStorage().get_by_id(task.id) is None
+
+    def test_flush_persists_changes(self, persisted_storage):
+        """Test that changes reach disk only once flushed."""
+        storage = persisted_storage
+        task = Task(title="Persisted", column="Backlog")
+        storage.create(task)
+        assert TaskStorage(file_path=storage.file_path).get_by_id(task.id) is None
+
+        storage.flush()
+        reloaded = TaskStorage(file_path=storage.file_path).get_by_id(task.id)
+        assert reloaded is not None
+        assert reloaded.created_at == task.created_at
+
+    def test_reload_large_file(self, persisted_storage):
+        """Test loading a file big enough to be read through mmap."""
+        storage = persisted_storage
+        for i in range(50):
+            storage.create(Task(title=f"Task {i}", description="x" * 2000, column="Backlog"))
+        storage.flush()
+        assert storage.file_path.stat().st_size >= MMAP_THRESHOLD_BYTES
+        
+        assert len(TaskStorage(file_path=storage.file_path).get_all()) == 50
+
+    def test_failed_flush_keeps_changes_pending(self, persisted_storage, monkeypatch):
+        """Test that a flush failing with any error is retried on the next one."""
+        storage = persisted_storage
+        task = Task(title="Retried", column="Backlog")
+        storage.create(task)
+        write_data = storage._write_data
+        
+        def fail_once(data):
+            monkeypatch.setattr(storage, "_write_data", write_data)
+            raise TypeError("not serializable")
+        monkeypatch.setattr(storage, "_write_data", fail_once)
+        
+        with pytest.raises(TypeError):
+            storage.flush()
+        storage.flush()
+        
+        assert TaskStorage(file_path=storage.file_path).get_by_id(task.id) is not None
+
+    def test_concurrent_writes_and_flushes(self, persisted_storage):
+        """Test that flushing while other threads mutate loses nothing."""
+        storage = persisted_storage
+        def create_many():
+            for i in range(50):
+                storage.create(Task(title=f"Task {i}", column="Backlog"))
+                storage.flush()
+        
+        threads = [threading.Thread(target=create_many) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        storage.flush()
+        
+        assert len(TaskStorage(file_path=storage.file_path).get_all()) == 200
+
 
 class TestUserStorage:
     """Test UserStorage functionality."""
     
     @pytest.fixture
     def storage(self):
-        """Create a fresh user storage."""
-        return UserStorage()
+        """Create a fresh in-memory user storage."""
+        return UserStorage(persist=False)
     
     def test_create_and_get_user(self, storage):
         """Test creating and retrieving a user."""
@@ -130,7 +233,38 @@ class TestUserStorage:
         assert storage.exists("existstest") is True
         assert storage.exists("nonexistent") is False
     
+    def test_create_many(self, storage):
+        """Test creating several users at once."""
+        users = [
+            User(username=name, hashed_password=get_password_hash("password"))
+            for name in ("bulk1", "bulk2")
+        ]
+        version = storage.version
+        
+        storage.create_many(users)
+        
+        assert storage.exists("bulk1") and storage.exists("bulk2")
+        assert storage.version == version + 1
+    
     def test_get_nonexistent_user(self, storage):
         """Test getting a non-existent user."""
         user = storage.get_by_username("definitely-not-exists")
         assert user is None
+
+
+class TestFlushAll:
+    """Test flushing every storage at once."""
+    
+    def test_failure_does_not_skip_other_storages(self, monkeypatch):
+        """Test that one failing storage still lets the others flush."""
+        flushed = []
+        
+        def fail():
+            raise OSError("disk full")
+        monkeypatch.setattr(task_storage, "flush", fail)
+        monkeypatch.setattr(user_storage, "flush", lambda: flushed.append("users"))
+        monkeypatch.setattr(category_storage, "flush", lambda: flushed.append("categories"))
+        
+        with pytest.raises(OSError):
+            flush_all()
+        assert flushed == ["users", "categories"]
@@ -1,15 +1,36 @@
 """Tests for task management endpoints."""
 
 import pytest
-from datetime import datetime, timedelta
+from pydantic import ValidationError
 
+from app.models import Task, TaskCreate
+from app.storage import task_storage
 
+# A fixed due date far enough ahead to always be in the future
+_FUTURE_DUE = "2099-01-07T00:00:00"
+
+# One character over the TaskBase length limits
+_TITLE_TOO_LONG = "x" * 201
+_DESC_TOO_LONG = "x" * 2001
+
+
+@pytest.fixture
+def seeded_tasks(sample_task):
+    """Store the sample task alongside tasks in other columns and priorities."""
+    others = [
+        Task(title="Done Task", column="Done", priority="High"),
+        Task(title="Low Task", column="Backlog", priority="Low"),
+    ]
+    return [sample_task] + [task_storage.create(task) for task in others]
+
+
+@pytest.mark.asyncio
 class TestTaskCRUD:
     """Test task CRUD operations."""
     
-    def test_create_task_minimal(self, client, auth_headers, test_user):
+    async def test_create_task_minimal(self, async_client, auth_headers, test_user):
         """Test creating a task with minimal fields."""
-        response = client.post(
+        response = await async_client.post(
             "/api/tasks",
             headers=auth_headers,
             json={"title": "New Task"}
@@ -22,10 +43,9 @@ class TestTaskCRUD:
         assert "id" in data
         assert "created_at" in data
     
-    def test_create_task_full(self, client, auth_headers, test_user):
+    async def test_create_task_full(self, async_client, auth_headers, test_user):
         """Test creating a task with all fields."""
-        due_date = (datetime.utcnow() + timedelta(days=7)).isoformat()
-        response = client.post(
+        response = await async_client.post(
             "/api/tasks",
             headers=auth_headers,
             json={
@@ -34,7 +54,7 @@ class TestTaskCRUD:
                 "priority": "High",
                 "category": "Work",
                 "column": "In Progress",
-                "due_date": due_date
+                "due_date": _FUTURE_DUE
             }
         )
         assert response.status_code == 201
@@ -44,50 +64,27 @@ class TestTaskCRUD:
         assert data["priority"] == "High"
         assert data["category"] == "Work"
         assert data["column"] == "In Progress"
+        assert data["due_date"] == _FUTURE_DUE
     
-    def test_create_task_invalid_column(self, client, auth_headers, test_user):
-        """Test creating a task with invalid column."""
-        response = client.post(
-            "/api/tasks",
-            headers=auth_headers,
-            json={"title": "Task", "column": "Invalid"}
-        )
-        assert response.status_code == 400
-        assert "Invalid column" in response.json()["detail"]
-    
-    def test_create_task_invalid_priority(self, client, auth_headers, test_user):
-        """Test creating a task with invalid priority."""
-        response = client.post(
-            "/api/tasks",
-            headers=auth_headers,
-            json={"title": "Task", "priority": "Invalid"}
-        )
-        assert response.status_code == 422  # Validation error
-    
-    def test_get_all_tasks(self, client, auth_headers, test_user, sample_task):
+    async def test_get_all_tasks(self, async_client, auth_headers, test_user, seeded_tasks):
         """Test getting all tasks."""
-        response = client.get("/api/tasks", headers=auth_headers)
+        response = await async_client.get("/api/tasks", headers=auth_headers)
         assert response.status_code == 200
         data = response.json()
         assert isinstance(data, list)
-        assert len(data) >= 1
+        assert {t["id"] for t in data} == {t.id for t in seeded_tasks}
     
-    def test_get_task_by_id(self, client, auth_headers, test_user, sample_task):
+    async def test_get_task_by_id(self, async_client, auth_headers, test_user, sample_task):
         """Test getting a specific task by ID."""
-        response = client.get(f"/api/tasks/{sample_task.id}", headers=auth_headers)
+        response = await async_client.get(f"/api/tasks/{sample_task.id}", headers=auth_headers)
         assert response.status_code == 200
         data = response.json()
         assert data["id"] == sample_task.id
         assert data["title"] == sample_task.title
     
-    def test_get_task_not_found(self, client, auth_headers, test_user):
-        """Test getting a non-existent task."""
-        response = client.get("/api/tasks/nonexistent-id", headers=auth_headers)
-        assert response.status_code == 404
-    
-    def test_update_task(self, client, auth_headers, test_user, sample_task):
+    async def test_update_task(self, async_client, auth_headers, test_user, sample_task):
         """Test updating a task."""
-        response = client.put(
+        response = await async_client.put(
             f"/api/tasks/{sample_task.id}",
             headers=auth_headers,
             json={"title": "Updated Title", "priority": "High"}
@@ -97,36 +94,34 @@ class TestTaskCRUD:
         assert data["title"] == "Updated Title"
         assert data["priority"] == "High"
     
-    def test_update_task_not_found(self, client, auth_headers, test_user):
-        """Test updating a non-existent task."""
-        response = client.put(
-            "/api/tasks/nonexistent-id",
-            headers=auth_headers,
-            json={"title": "Updated"}
-        )
-        assert response.status_code == 404
-    
-    def test_delete_task(self, client, auth_headers, test_user, sample_task):
+    async def test_delete_task(self, async_client, auth_headers, test_user, sample_task):
         """Test deleting a task."""
-        response = client.delete(f"/api/tasks/{sample_task.id}", headers=auth_headers)
+        response = await async_client.delete(f"/api/tasks/{sample_task.id}", headers=auth_headers)
         assert response.status_code == 204
         
-        # Verify deletion
-        response = client.get(f"/api/tasks/{sample_task.id}", headers=auth_headers)
-        assert response.status_code == 404
+        # Verify deletion; the not-found GET path is covered by test_task_not_found
+        assert task_storage.get_by_id(sample_task.id) is None
     
-    def test_delete_task_not_found(self, client, auth_headers, test_user):
-        """Test deleting a non-existent task."""
-        response = client.delete("/api/tasks/nonexistent-id", headers=auth_headers)
-        assert response.status_code == 404
+    @pytest.mark.parametrize("method,path,body", [
+        ("GET", "/api/tasks/nonexistent-id", None),
+        ("PUT", "/api/tasks/nonexistent-id", {"title": "Updated"}),
+        ("DELETE", "/api/tasks/nonexistent-id", None),
+        ("PATCH", "/api/tasks/nonexistent-id/move", {"column": "Done"}),
+    ])
+    async def test_task_not_found(self, async_client, auth_headers, test_user, method, path, body):
+        """Test operations on a non-existent task."""
+        # Only the status matters, so the error body is never read
+        async with async_client.stream(method, path, headers=auth_headers, json=body) as response:
+            assert response.status_code == 404
 
 
+@pytest.mark.asyncio
 class TestTaskMove:
     """Test task movement between columns."""
     
-    def test_move_task(self, client, auth_headers, test_user, sample_task):
+    async def test_move_task(self, async_client, auth_headers, test_user, sample_task):
         """Test moving a task to a different column."""
-        response = client.patch(
+        response = await async_client.patch(
             f"/api/tasks/{sample_task.id}/move",
             headers=auth_headers,
             json={"column": "In Progress"}
@@ -135,132 +130,130 @@ class TestTaskMove:
         data = response.json()
         assert data["column"] == "In Progress"
     
-    def test_move_task_invalid_column(self, client, auth_headers, test_user, sample_task):
+    async def test_move_task_invalid_column(self, async_client, auth_headers, test_user, sample_task):
         """Test moving a task to an invalid column."""
-        response = client.patch(
+        response = await async_client.patch(
             f"/api/tasks/{sample_task.id}/move",
             headers=auth_headers,
             json={"column": "Invalid Column"}
         )
         assert response.status_code == 400
-    
-    def test_move_task_not_found(self, client, auth_headers, test_user):
-        """Test moving a non-existent task."""
-        response = client.patch(
-            "/api/tasks/nonexistent-id/move",
-            headers=auth_headers,
-            json={"column": "Done"}
-        )
-        assert response.status_code == 404
 
 
+@pytest.mark.asyncio
 class TestTaskFilters:
     """Test task filtering and board views."""
     
-    def test_get_board(self, client, auth_headers, test_user, sample_task):
+    async def test_get_board(self, async_client, auth_headers, test_user, sample_task):
         """Test getting the board view."""
-        response = client.get("/api/tasks/board", headers=auth_headers)
+        response = await async_client.get("/api/tasks/board", headers=auth_headers)
         assert response.status_code == 200
         data = response.json()
-        assert "Recurring" in data
-        assert "Backlog" in data
-        assert "In Progress" in data
-        assert "Review" in data
-        assert "Done" in data
+        assert data.keys() >= {"Recurring", "Backlog", "In Progress", "Review", "Done"}
         assert len(data["Backlog"]) >= 1
     
-    def test_filter_by_column(self, client, auth_headers, test_user, sample_task):
+    async def test_get_board_not_modified(self, async_client, auth_headers, test_user, sample_task):
+        """Test that the board honours If-None-Match until tasks change."""
+        response = await async_client.get("/api/tasks/board", headers=auth_headers)
+        etag = response.headers["ETag"]
+        
+        response = await async_client.get(
+            "/api/tasks/board",
+            headers={**auth_headers, "If-None-Match": etag}
+        )
+        assert response.status_code == 304
+        
+        await async_client.post("/api/tasks", headers=auth_headers, json={"title": "Another"})
+        response = await async_client.get(
+            "/api/tasks/board",
+            headers={**auth_headers, "If-None-Match": etag}
+        )
+        assert response.status_code == 200
+        assert response.headers["ETag"] != etag
+    
+    async def test_filter_by_column(self, async_client, auth_headers, test_user, seeded_tasks):
         """Test filtering tasks by column."""
-        response = client.get("/api/tasks?column=Backlog", headers=auth_headers)
+        response = await async_client.get("/api/tasks?column=Backlog", headers=auth_headers)
         assert response.status_code == 200
         data = response.json()
-        assert all(t["column"] == "Backlog" for t in data)
+        assert {t["id"] for t in data} == {t.id for t in seeded_tasks if t.column == "Backlog"}
     
-    def test_filter_by_priority(self, client, auth_headers, test_user, sample_task):
+    async def test_filter_by_priority(self, async_client, auth_headers, test_user, seeded_tasks):
         """Test filtering tasks by priority."""
-        response = client.get("/api/tasks?priority=Medium", headers=auth_headers)
+        response = await async_client.get("/api/tasks?priority=Medium", headers=auth_headers)
         assert response.status_code == 200
         data = response.json()
-        assert all(t["priority"] == "Medium" for t in data)
+        assert {t["id"] for t in data} == {t.id for t in seeded_tasks if t.priority == "Medium"}
     
-    def test_get_columns(self, client, auth_headers, test_user):
+    async def test_get_columns(self, async_client, auth_headers, test_user):
         """Test getting available columns."""
-        response = client.get("/api/tasks/columns", headers=auth_headers)
+        response = await async_client.get("/api/tasks/columns", headers=auth_headers)
         assert response.status_code == 200
         data = response.json()
-        assert "columns" in data
-        assert "Backlog" in data["columns"]
-        assert "Done" in data["columns"]
+        assert set(data["columns"]) >= {"Backlog", "Done"}
     
-    def test_get_priorities(self, client, auth_headers, test_user):
+    async def test_get_priorities(self, async_client, auth_headers, test_user):
         """Test getting available priorities."""
-        response = client.get("/api/tasks/priorities", headers=auth_headers)
+        response = await async_client.get("/api/tasks/priorities", headers=auth_headers)
         assert response.status_code == 200
         data = response.json()
-        assert "priorities" in data
-        assert "High" in data["priorities"]
-        assert "Medium" in data["priorities"]
-        assert "Low" in data["priorities"]
+        assert set(data["priorities"]) >= {"High", "Medium", "Low"}
     
-    def test_get_categories(self, client, auth_headers, test_user, sample_task):
+    async def test_get_categories(self, async_client, auth_headers, test_user, sample_task):
         """Test getting categories from existing tasks."""
-        response = client.get("/api/tasks/categories", headers=auth_headers)
+        response = await async_client.get("/api/tasks/categories", headers=auth_headers)
         assert response.status_code == 200
-        data = response.json()
-        assert "categories" in data
-        assert "Testing" in data["categories"]
+        categories = response.json()["categories"]
+        assert set(categories) >= {"Testing"}
+        assert len(set(categories)) == len(categories)  # No duplicates
 
 
 class TestTaskValidation:
     """Test input validation for tasks."""
     
-    def test_title_required(self, client, auth_headers, test_user):
-        """Test that title is required."""
-        response = client.post(
-            "/api/tasks",
-            headers=auth_headers,
-            json={"description": "No title"}
-        )
-        assert response.status_code == 422
+    @pytest.mark.parametrize("payload", [
+        {"title": "Task", "priority": "Invalid"},
+        {"description": "No title"},
+        {"title": _TITLE_TOO_LONG},
+        {"title": "Task", "description": _DESC_TOO_LONG},
+    ], ids=["invalid_priority", "title_required", "title_max_length", "description_max_length"])
+    def test_task_create_invalid(self, payload):
+        """Test that invalid task fields fail model validation."""
+        with pytest.raises(ValidationError):
+            TaskCreate.model_validate(payload)
     
-    def test_title_max_length(self, client, auth_headers, test_user):
-        """Test title maximum length validation."""
-        response = client.post(
+    @pytest.mark.asyncio
+    async def test_create_task_validation_error(self, async_client, auth_headers, test_user):
+        """Test that the endpoint reports model validation errors as 422."""
+        response = await async_client.post(
             "/api/tasks",
             headers=auth_headers,
-            json={"title": "x" * 201}  # Over 200 chars
+            json={"description": "No title"}
         )
         assert response.status_code == 422
     
-    def test_description_max_length(self, client, auth_headers, test_user):
-        """Test description maximum length validation."""
-        response = client.post(
+    @pytest.mark.asyncio
+    async def test_create_task_invalid_column(self, async_client, auth_headers, test_user):
+        """Test creating a task with invalid column."""
+        response = await async_client.post(
             "/api/tasks",
             headers=auth_headers,
-            json={"title": "Task", "description": "x" * 2001}  # Over 2000 chars
+            json={"title": "Task", "column": "Invalid"}
         )
-        assert response.status_code == 422
+        assert response.status_code == 400
+        assert "Invalid column" in response.json()["detail"]
 
 
 class TestUnauthorizedAccess:
     """Test that endpoints require authentication."""
     
-    def test_get_tasks_unauthorized(self, client):
-        """Test getting tasks without auth."""
-        response = client.get("/api/tasks")
-        assert response.status_code == 401
-    
-    def test_create_task_unauthorized(self, client):
-        """Test creating a task without auth."""
-        response = client.post("/api/tasks", json={"title": "Test"})
-        assert response.status_code == 401
-    
-    def test_update_task_unauthorized(self, client):
-        """Test updating a task without auth."""
-        response = client.put("/api/tasks/some-id", json={"title": "Test"})
-        assert response.status_code == 401
-    
-    def test_delete_task_unauthorized(self, client):
-        """Test deleting a task without auth."""
-        response = client.delete("/api/tasks/some-id")
-        assert response.status_code == 401
+    @pytest.mark.parametrize("method,path,body", [
+        ("GET", "/api/tasks", None),
+        ("POST", "/api/tasks", {"title": "Test"}),
+        ("PUT", "/api/tasks/some-id", {"title": "Test"}),
+        ("DELETE", "/api/tasks/some-id", None),
+    ])
+    def test_unauthorized(self, client, method, path, body):
+        """Test that the endpoint rejects requests without auth."""
+        with client.stream(method, path, json=body) as response:
+            assert response.status_code == 401